@@ -10,6 +10,7 @@ from typing import Sequence
 from torch.utils.data import Dataset
 
 from ..utils import get_subjects_from_batch
+from .image import VolumeCache
 from .subject import Subject
 
 
@@ -29,6 +30,11 @@ class SubjectsDataset(Dataset):
         load_getitem: Load all subject images before returning it in
             :meth:`__getitem__`. Set it to ``False`` if some of the images will
             not be needed during training.
+        cache_size: Maximum number of volumes kept in memory after being read
+            from disk, so that they are not read again in the next epochs.
+            If ``0``, volumes are not cached. Each dataset has its own cache,
+            and each worker of a :class:`~torch.utils.data.DataLoader` keeps
+            its own copy. See :class:`~torchio.data.image.VolumeCache`.
 
     Example:
         >>> import torchio as tio
@@ -69,12 +75,14 @@ class SubjectsDataset(Dataset):
         subjects: Sequence[Subject],
         transform: Optional[Callable] = None,
         load_getitem: bool = True,
+        cache_size: int = 0,
     ):
         self._parse_subjects_list(subjects)
         self._subjects = subjects
         self._transform: Optional[Callable]
         self.set_transform(transform)
         self.load_getitem = load_getitem
+        self._volume_cache = VolumeCache(cache_size) if cache_size else None
 
     def __len__(self):
         return len(self._subjects)
@@ -92,7 +100,11 @@ class SubjectsDataset(Dataset):
         subject = self._subjects[index]
         subject = copy.deepcopy(subject)  # cheap since images not loaded yet
         if self.load_getitem:
-            subject.load()
+            if self._volume_cache is None:
+                subject.load()
+            else:
+                with self._volume_cache.activate():
+                    subject.load()
 
         # Apply transform (this is usually the bottleneck)
         if self._transform is not None:
@@ -1,9 +1,14 @@
+import contextlib
+import contextvars
+import functools
+import os
 import warnings
 from collections import Counter
 from pathlib import Path
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -56,6 +61,90 @@ deprecation_message = (
 )
 
 
+def _read_uncached(
+    reader: Callable,
+    path: TypePath,
+    modification_time: int,
+) -> TypeDataAffine:
+    # The modification time is only used as part of the cache key
+    tensor, affine = reader(path)
+    # Readers might return memory-mapped data, e.g. for uncompressed NIfTI
+    # files. The data is copied so that cached volumes are kept in memory and
+    # do not keep the files open
+    if isinstance(tensor, torch.Tensor):
+        tensor = tensor.clone(memory_format=torch.contiguous_format)
+    else:
+        tensor = np.array(tensor)
+    return tensor, affine
+
+
+class VolumeCache:
+    """In-memory cache of volumes read from disk by :meth:`Image.load`.
+
+    Volumes are cached using their path and modification time, so files
+    modified on disk are read again. The cache is only used by images loaded
+    inside :meth:`activate`. Pickled copies, e.g., in the workers of a
+    :class:`~torch.utils.data.DataLoader`, start with an empty cache.
+
+    Args:
+        size: Maximum number of volumes in the cache.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._read = functools.lru_cache(maxsize=size)(_read_uncached)
+
+    def __getstate__(self) -> Dict[str, int]:
+        return {'size': self.size}
+
+    def __setstate__(self, state: Dict[str, int]) -> None:
+        self.__init__(state['size'])  # type: ignore[misc]
+
+    def cache_info(self):
+        return self._read.cache_info()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[None]:
+        token = _active_volume_cache.set(self)
+        try:
+            yield
+        finally:
+            _active_volume_cache.reset(token)
+
+    def read(self, reader: Callable, path: TypePath) -> TypeDataAffine:
+        modification_time = os.stat(path).st_mtime_ns
+        tensor, affine = self._read(reader, path, modification_time)
+        # Copy the cached data so that in-place operations do not modify it
+        if isinstance(tensor, torch.Tensor):
+            tensor = tensor.clone(memory_format=torch.contiguous_format)
+        else:
+            tensor = np.copy(tensor)
+        return tensor, affine
+
+
+# Cache used by the images being loaded, if any
+_active_volume_cache: contextvars.ContextVar[Optional[VolumeCache]] = (
+    contextvars.ContextVar('volume_cache', default=None)
+)
+
+
+def _read_with_cache(reader: Callable, path: TypePath) -> TypeDataAffine:
+    cache = _active_volume_cache.get()
+    if cache is None:
+        return reader(path)
+    return cache.read(reader, path)
+
+
+@functools.lru_cache(maxsize=None)
+def _check_path_exists(path: Path) -> None:
+    # Only existing paths are cached, as exceptions are not. Paths in a
+    # dataset rarely change, and this avoids querying the file system every
+    # time an image with the same path is instantiated. The path must be
+    # absolute, as relative paths depend on the working directory
+    if not (path.is_file() or path.is_dir()):  # might be a dir with DICOM
+        raise FileNotFoundError(f'File not found: "{path}"')
+
+
 class Image(dict):
     r"""TorchIO image.
 
@@ -94,6 +183,13 @@ class Image(dict):
             2D, :math:`4 \times 4` affine matrix. This can be used if your data
             is saved in a custom format, such as ``.npy`` (see example below).
             If the affine matrix is ``None``, an identity matrix will be used.
+        pin_memory: If ``True`` and CUDA is available, the data read from
+            disk is stored in page-locked memory, so that it can be copied to
+            the GPU asynchronously using ``non_blocking=True``. This is only
+            useful if images are loaded in the main process, e.g., with
+            ``num_workers=0``. In that case, ``pin_memory=False`` should be
+            used in the :class:`~torch.utils.data.DataLoader` to avoid pinning
+            twice. Tensors sent from worker processes are not pinned.
         **kwargs: Items that will be added to the image dictionary, e.g.
             acquisition parameters.
 
@@ -135,10 +231,12 @@ class Image(dict):
         affine: Optional[TypeData] = None,
         check_nans: bool = False,  # removed by ITK by default
         reader: Callable = read_image,
+        pin_memory: bool = False,
         **kwargs: Dict[str, Any],
     ):
         self.check_nans = check_nans
         self.reader = reader
+        self.pin_memory = pin_memory
 
         if type is None:
             warnings.warn(
@@ -222,6 +320,7 @@ class Image(dict):
         new_image = new_image_class(
             check_nans=self.check_nans,
             reader=self.reader,
+            pin_memory=self.pin_memory,
             **kwargs,
         )
         return new_image
@@ -278,10 +377,9 @@ class Image(dict):
         """Tensor shape as :math:`(C, W, H, D)`."""
         custom_reader = self.reader is not read_image
         multipath = self._is_multipath()
-        if isinstance(self.path, Path):
-            is_dir = self.path.is_dir()
         shape: TypeQuartetInt
-        if self._loaded or custom_reader or multipath or is_dir:
+        # The file system is only queried if the image has not been loaded
+        if self._loaded or custom_reader or multipath or self._is_dir():
             channels, si, sj, sk = self.data.shape
             shape = channels, si, sj, sk
         else:
@@ -448,8 +546,7 @@ class Image(dict):
             message = f'Conversion to path not possible for variable: {path}'
             raise RuntimeError(message)
 
-        if not (path.is_file() or path.is_dir()):  # might be a dir with DICOM
-            raise FileNotFoundError(f'File not found: "{path}"')
+        _check_path_exists(path.absolute())
         return path
 
     def _parse_path(
@@ -490,10 +587,23 @@ class Image(dict):
             raise ValueError(f'Input tensor must be 4D, but it is {ndim}D')
         if tensor.dtype == torch.bool:
             tensor = tensor.to(torch.uint8)
-        if self.check_nans and torch.isnan(tensor).any():
+        if self.check_nans and self._has_nans(tensor):
             warnings.warn('NaNs found in tensor', RuntimeWarning, stacklevel=2)
         return tensor
 
+    @staticmethod
+    def _has_nans(tensor: torch.Tensor) -> bool:
+        # Integer tensors cannot contain NaNs. For floating point tensors, the
+        # sum is NaN if any value is NaN. This is a single reduction, which is
+        # cheaper than allocating a boolean tensor with torch.isnan(). The sum
+        # can also be NaN without NaNs, e.g. if it overflows to both infinities,
+        # so that case is confirmed by checking all values
+        if not tensor.is_floating_point():
+            return False
+        if not torch.isnan(tensor.sum()):
+            return False
+        return bool(torch.isnan(tensor).any())
+
     @staticmethod
     def _parse_tensor_shape(tensor: torch.Tensor) -> TypeData:
         return ensure_4d(tensor)
@@ -569,7 +679,14 @@ class Image(dict):
                 )
                 RuntimeError(message)
             tensors.append(new_tensor)
-        tensor = torch.cat(tensors)
+        if len(tensors) > 1:
+            tensor = torch.cat(tensors)
+        # Readers might return transposed arrays. This is a no-op if the tensor
+        # is already contiguous
+        tensor = tensor.contiguous()
+        if self.pin_memory and torch.cuda.is_available():
+            tensor = tensor.pin_memory()
+        assert tensor.is_contiguous()
         self.set_data(tensor)
         self.affine = affine
         self._loaded = True
@@ -595,14 +712,14 @@ class Image(dict):
         self._loaded = False
 
     def read_and_check(self, path: TypePath) -> TypeDataAffine:
-        tensor, affine = self.reader(path)
+        tensor, affine = _read_with_cache(self.reader, path)
         # Make sure the data type is compatible with PyTorch
         if self.reader is not read_image and isinstance(tensor, np.ndarray):
             tensor = check_uint_to_int(tensor)
         tensor = self._parse_tensor_shape(tensor)
         tensor = self._parse_tensor(tensor)
         affine = self._parse_affine(affine)
-        if self.check_nans and torch.isnan(tensor).any():
+        if self.check_nans and self._has_nans(tensor):
             warnings.warn(
                 f'NaNs found in file "{path}"',
                 RuntimeWarning,
@@ -29,8 +29,16 @@ FLIPXY_44 = np.diag([-1, -1, 1, 1])
 formats = ['.jpg', '.jpeg', '.bmp', '.png', '.tif', '.tiff']
 IMAGE_2D_FORMATS = formats + [s.upper() for s in formats]
 
+# Image formats that are read with NiBabel
+NIFTI_SUFFIXES = '.nii', '.nii.gz'
+
 
 def read_image(path: TypePath) -> TypeDataAffine:
+    if _is_nifti(path):
+        try:
+            return _read_nifti(path)
+        except (nib.loadsave.ImageFileError, TypeError, ValueError):
+            pass  # try with SimpleITK
     try:
         result = _read_sitk(path)
     except RuntimeError as e:  # try with NiBabel
@@ -61,6 +69,77 @@ def _read_nibabel(path: TypePath) -> TypeDataAffine:
     return tensor, affine
 
 
+def _is_nifti(path: TypePath) -> bool:
+    return str(path).lower().endswith(NIFTI_SUFFIXES)
+
+
+def _read_nifti(path: TypePath) -> TypeDataAffine:
+    """Read a NIfTI image using NiBabel.
+
+    This is faster than using SimpleITK. Uncompressed files are memory-mapped,
+    so the data is not read from disk until it is accessed.
+    """
+    img: SpatialImage = nib.load(str(path), mmap=True)  # type: ignore[assignment]
+    affine = _get_nifti_affine(img)
+    if affine is None:
+        raise ValueError('The affine might be different if read with SimpleITK')
+    proxy = img.dataobj
+    if proxy.slope != 1 or proxy.inter != 0:  # type: ignore[attr-defined]
+        # Like ITK, use single precision for scaled data
+        dtype = np.float64 if proxy.dtype == np.float64 else np.float32
+        array = np.asarray(proxy, dtype=dtype)
+    else:
+        array = np.asarray(proxy)
+    data = _nifti_to_4d(array)
+    if data.dtype.fields is not None:  # e.g. RGB, not supported by PyTorch
+        raise TypeError(f'Data type "{data.dtype}" not supported')
+    if not data.dtype.isnative:
+        data = data.astype(data.dtype.newbyteorder('='))
+    data = check_uint_to_int(data)
+    tensor = torch.as_tensor(data)
+    return tensor, affine
+
+
+def _get_nifti_affine(img: SpatialImage) -> Optional[np.ndarray]:
+    """Get the affine of a NIfTI image, if SimpleITK reads the same one.
+
+    NiBabel and ITK choose differently between the qform and the sform, and
+    ITK does not support sheared affines or pixdim spacing in 2D images, so
+    ``None`` is returned in those cases.
+    """
+    if len(img.shape) < 3:
+        return None
+    qform, qform_code = img.get_qform(coded=True)  # type: ignore[attr-defined]
+    sform, sform_code = img.get_sform(coded=True)  # type: ignore[attr-defined]
+    forms = (qform, qform_code), (sform, sform_code)
+    affines = [affine for affine, code in forms if code > 0]
+    if not affines:  # NiBabel would use an affine centered on the image
+        return None
+    if len(affines) == 2 and not np.allclose(*affines, rtol=0, atol=1e-5):
+        return None
+    affine = affines[-1]
+    rotation_zoom = affine[:3, :3]
+    direction = rotation_zoom / np.linalg.norm(rotation_zoom, axis=0)
+    if not np.allclose(direction.T @ direction, np.eye(3), rtol=0, atol=1e-5):
+        return None
+    return affine
+
+
+def _nifti_to_4d(array: np.ndarray) -> np.ndarray:
+    """Convert a NIfTI array with dimensions (W, H[, D[, T[, C]]])."""
+    if array.ndim == 2:  # (W, H)
+        array = array[np.newaxis, ..., np.newaxis]
+    elif array.ndim == 3:  # (W, H, D)
+        array = array[np.newaxis]
+    elif array.ndim == 4:  # (W, H, D, T)
+        array = array.transpose(3, 0, 1, 2)
+    elif array.ndim == 5 and array.shape[3] == 1:  # (W, H, D, 1, C)
+        array = array[..., 0, :].transpose(3, 0, 1, 2)
+    else:
+        raise ValueError(f'NIfTI array shape not supported: {array.shape}')
+    return array
+
+
 def _read_sitk(path: TypePath) -> TypeDataAffine:
     if Path(path).is_dir():  # assume DICOM
         image = _read_dicom(path)
@@ -87,6 +166,20 @@ def _read_dicom(directory: TypePath):
 
 
 def read_shape(path: TypePath) -> TypeQuartetInt:
+    if _is_nifti(path):
+        img: SpatialImage = nib.load(str(path))  # type: ignore[assignment]
+        # Structured data types (e.g. RGB) are read with SimpleITK, like in
+        # read_image(), as they are stored as channels
+        if img.get_data_dtype().fields is None:
+            # Broadcasting is used to get the shape without allocating memory
+            dummy = np.broadcast_to(False, img.shape)
+            try:
+                shape_4d = _nifti_to_4d(dummy).shape
+            except ValueError:
+                pass  # try with SimpleITK
+            else:
+                num_channels, si, sj, sk = shape_4d
+                return num_channels, si, sj, sk
     reader = sitk.ImageFileReader()
     reader.SetFileName(str(path))
     reader.ReadImageInformation()
@@ -112,6 +205,11 @@ def read_shape(path: TypePath) -> TypeQuartetInt:
 
 
 def read_affine(path: TypePath) -> np.ndarray:
+    if _is_nifti(path):
+        # Use the same library that will be used to read the data
+        nifti_affine = _get_nifti_affine(nib.load(str(path)))
+        if nifti_affine is not None:
+            return nifti_affine
     reader = get_reader(path)
     affine = get_ras_affine_from_sitk(reader)
     return affine
@@ -50,7 +50,8 @@ class RandomTransform(Transform):
         return int(torch.randint(0, 2**31, (1,)).item())
 
     def sample_uniform_sextet(self, params):
-        results = []
-        for a, b in zip(params[::2], params[1::2]):
-            results.append(self.sample_uniform(a, b))
-        return torch.Tensor(results)
+        # Sample all values at once, drawing from the generator in the same
+        # order as calling sample_uniform() for each pair
+        ranges = torch.as_tensor(params, dtype=torch.float32).view(-1, 2)
+        low, high = ranges.unbind(dim=-1)
+        return torch.rand(len(ranges)).mul_(high - low).add_(low)
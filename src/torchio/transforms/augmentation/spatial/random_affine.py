@@ -1,28 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from numbers import Number
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+import nibabel as nib
 import numpy as np
 import SimpleITK as sitk
 import torch
+import torch.nn.functional as F  # noqa: N812
 
 from .. import RandomTransform
 from ... import SpatialTransform
 from ....constants import INTENSITY
 from ....constants import TYPE
+from ....data.image import Image
+from ....data.io import FLIPXY_44
 from ....data.io import nib_to_sitk
 from ....data.subject import Subject
 from ....typing import TypeRangeFloat
 from ....typing import TypeSextetFloat
 from ....typing import TypeTripletFloat
-from ....utils import get_major_sitk_version
+from ....typing import TypeTripletInt
 from ....utils import to_tuple
 
 
 TypeOneToSixFloat = Union[TypeRangeFloat, TypeTripletFloat, TypeSextetFloat]
 
+# Interpolations that are computed with PyTorch instead of SimpleITK when
+# resampling on an accelerator. On the CPU, SimpleITK is faster. Nearest
+# neighbor interpolation is not included, as grid_sample rounds half-voxel
+# ties to even while ITK rounds them up, which would remove labels
+GRID_SAMPLE_MODES = {
+    'linear': 'bilinear',
+}
+
+# Transforms closer than this to the identity are not applied
+SCALES_TOLERANCE = 1e-3
+DEGREES_TOLERANCE = 1e-2
+TRANSLATION_TOLERANCE = 1e-3
+
 
 class RandomAffine(RandomTransform, SpatialTransform):
     r"""Apply a random affine transformation and resample the image.
@@ -86,6 +107,10 @@ class RandomAffine(RandomTransform, SpatialTransform):
         check_shape: If ``True`` an error will be raised if the images are in
             different physical spaces. If ``False``, :attr:`center` should
             probably not be ``'image'`` but ``'center'``.
+        device: Device where the transformed tensors are stored, e.g.
+            ``'cuda'``. Images with linear interpolation are resampled on this
+            device using :func:`torch.nn.functional.grid_sample`. If
+            ``None``, the tensors are kept on the CPU.
         **kwargs: See :class:`~torchio.transforms.Transform` for additional
             keyword arguments.
 
@@ -120,6 +145,7 @@ class RandomAffine(RandomTransform, SpatialTransform):
         image_interpolation: str = 'linear',
         label_interpolation: str = 'nearest',
         check_shape: bool = True,
+        device: Optional[Union[str, torch.device]] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -140,6 +166,7 @@ class RandomAffine(RandomTransform, SpatialTransform):
             label_interpolation,
         )
         self.check_shape = check_shape
+        self.device = device
 
     def get_params(
         self,
@@ -148,11 +175,11 @@ class RandomAffine(RandomTransform, SpatialTransform):
         translation: TypeSextetFloat,
         isotropic: bool,
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
-        scaling_params = self.sample_uniform_sextet(scales)
+        # A single draw for the nine parameters
+        params = self.sample_uniform_sextet((*scales, *degrees, *translation))
+        scaling_params, rotation_params, translation_params = params.view(3, 3)
         if isotropic:
             scaling_params.fill_(scaling_params[0])
-        rotation_params = self.sample_uniform_sextet(degrees)
-        translation_params = self.sample_uniform_sextet(translation)
         return scaling_params, rotation_params, translation_params
 
     def apply_transform(self, subject: Subject) -> Subject:
@@ -171,6 +198,7 @@ class RandomAffine(RandomTransform, SpatialTransform):
             'image_interpolation': self.image_interpolation,
             'label_interpolation': self.label_interpolation,
             'check_shape': self.check_shape,
+            'device': self.device,
         }
         transform = Affine(**self.add_include_exclude(arguments))
         transformed = transform(subject)
@@ -204,8 +232,20 @@ class Affine(SpatialTransform):
         check_shape: If ``True`` an error will be raised if the images are in
             different physical spaces. If ``False``, :attr:`center` should
             probably not be ``'image'`` but ``'center'``.
+        device: Device where the transformed tensors are stored, e.g.
+            ``'cuda'``. Images with linear interpolation are resampled on this
+            device using :func:`torch.nn.functional.grid_sample`. If
+            ``None``, the tensors are kept on the CPU.
         **kwargs: See :class:`~torchio.transforms.Transform` for additional
             keyword arguments.
+
+    .. note:: Images are resampled with SimpleITK, unless :attr:`device` is
+        an accelerator and the interpolation is ``'linear'``.
+
+    .. note:: If the transform is very close to the identity, i.e., all
+        scaling values differ from 1 by less than 0.001, all angles are smaller
+        than 0.01 degrees and all translations are smaller than 0.001 mm,
+        the images are not resampled, but they are still cast to float32.
     """
 
     def __init__(
@@ -218,6 +258,7 @@ class Affine(SpatialTransform):
         image_interpolation: str = 'linear',
         label_interpolation: str = 'nearest',
         check_shape: bool = True,
+        device: Optional[Union[str, torch.device]] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -254,6 +295,7 @@ class Affine(SpatialTransform):
         )
         self.invert_transform = False
         self.check_shape = check_shape
+        self.device = device
         self.args_names = [
             'scales',
             'degrees',
@@ -263,39 +305,33 @@ class Affine(SpatialTransform):
             'image_interpolation',
             'label_interpolation',
             'check_shape',
+            'device',
         ]
 
     @staticmethod
-    def _get_scaling_transform(
+    def _get_scaling_and_rotation_transform(
         scaling_params: Sequence[float],
-        center_lps: Optional[TypeTripletFloat] = None,
-    ) -> sitk.ScaleTransform:
-        # 1.5 means the objects look 1.5 times larger
-        transform = sitk.ScaleTransform(3)
-        scaling_params_array = np.array(scaling_params).astype(float)
-        transform.SetScale(scaling_params_array)
-        if center_lps is not None:
-            transform.SetCenter(center_lps)
-        return transform
-
-    @staticmethod
-    def _get_rotation_transform(
         degrees: Sequence[float],
         translation: Sequence[float],
         center_lps: Optional[TypeTripletFloat] = None,
-    ) -> sitk.Euler3DTransform:
+    ) -> sitk.AffineTransform:
         def ras_to_lps(triplet: Sequence[float]):
             return np.array((-1, -1, 1), dtype=float) * np.asarray(triplet)
 
-        transform = sitk.Euler3DTransform()
-        radians = np.radians(degrees).tolist()
+        # 1.5 means the objects look 1.5 times larger
+        scaling_matrix = np.diag(np.array(scaling_params).astype(float))
 
         # SimpleITK uses LPS
-        radians_lps = ras_to_lps(radians)
+        radians_lps = ras_to_lps(np.radians(degrees))
         translation_lps = ras_to_lps(translation)
-
-        transform.SetRotation(*radians_lps)
-        transform.SetTranslation(translation_lps)
+        rotation_matrix = get_rotation_matrix(*radians_lps)
+
+        # A single transform equivalent to rotating and translating around the
+        # center, then scaling around the center. This is faster than using a
+        # composite transform, as the resampler evaluates one transform only
+        transform = sitk.AffineTransform(3)
+        transform.SetMatrix((scaling_matrix @ rotation_matrix).ravel().tolist())
+        transform.SetTranslation((scaling_matrix @ translation_lps).tolist())
         if center_lps is not None:
             transform.SetCenter(center_lps)
         return transform
@@ -314,25 +350,13 @@ class Affine(SpatialTransform):
         else:
             center_lps = None
 
-        scaling_transform = self._get_scaling_transform(
+        transform = self._get_scaling_and_rotation_transform(
             scaling,
-            center_lps=center_lps,
-        )
-        rotation_transform = self._get_rotation_transform(
             rotation,
             translation,
             center_lps=center_lps,
         )
 
-        sitk_major_version = get_major_sitk_version()
-        if sitk_major_version == 1:
-            transform = sitk.Transform(3, sitk.sitkComposite)
-            transform.AddTransform(scaling_transform)
-            transform.AddTransform(rotation_transform)
-        elif sitk_major_version == 2:
-            transforms = [scaling_transform, rotation_transform]
-            transform = sitk.CompositeTransform(transforms)
-
         # ResampleImageFilter expects the transform from the output space to
         # the input space. Intuitively, the passed arguments should take us
         # from the input space to the output space, so we need to invert the
@@ -348,52 +372,244 @@ class Affine(SpatialTransform):
     def apply_transform(self, subject: Subject) -> Subject:
         if self.check_shape:
             subject.check_consistent_spatial_shape()
-        default_value: float
+        if self.is_identity():
+            # Match the type and device of the resampled images
+            for image in self.get_images(subject):
+                image.set_data(image.data.to(self.device, torch.float32))
+            return subject
+        # Images in the same space share the same sampling grid, and images
+        # that also share the interpolation are resampled together
+        grids: Dict[Tuple[TypeTripletInt, bytes], torch.Tensor] = {}
+        batches: Dict[tuple, List[Tuple[Image, List[float]]]] = {}
+        sitk_jobs: List[tuple] = []
+        transformed_images = []
         for image in self.get_images(subject):
             transform = self.get_affine_transform(image)
-            transformed_tensors = []
-            for tensor in image.data:
-                sitk_image = nib_to_sitk(
-                    tensor[np.newaxis],
-                    image.affine,
-                    force_3d=True,
-                )
-                if image[TYPE] != INTENSITY:
-                    interpolation = self.label_interpolation
-                    default_value = 0
-                else:
-                    interpolation = self.image_interpolation
-                    if self.default_pad_value == 'minimum':
-                        default_value = tensor.min().item()
-                    elif self.default_pad_value == 'mean':
-                        default_value = get_borders_mean(
-                            sitk_image,
-                            filter_otsu=False,
-                        )
-                    elif self.default_pad_value == 'otsu':
-                        default_value = get_borders_mean(
-                            sitk_image,
-                            filter_otsu=True,
-                        )
-                    else:
-                        assert isinstance(self.default_pad_value, Number)
-                        default_value = float(self.default_pad_value)
-                transformed_tensor = self.apply_affine_transform(
-                    sitk_image,
-                    transform,
-                    interpolation,
-                    default_value,
-                )
-                transformed_tensors.append(transformed_tensor)
-            image.set_data(torch.stack(transformed_tensors))
+            if image[TYPE] != INTENSITY:
+                interpolation = self.label_interpolation
+            else:
+                interpolation = self.image_interpolation
+            default_values = [
+                self.get_default_value(tensor, image) for tensor in image.data
+            ]
+            if self.use_grid_sample(interpolation):
+                space = image.spatial_shape, image.affine.tobytes()
+                if space not in grids:
+                    grids[space] = self.get_sampling_grid(
+                        image,
+                        transform,
+                        device=self.device,
+                    )
+                batch = batches.setdefault((space, interpolation), [])
+                batch.append((image, default_values))
+            else:
+                # Each channel is resampled later and written directly into
+                # the output tensor
+                transformed = torch.empty(image.shape, dtype=torch.float32)
+                channels = zip(transformed, image.data, default_values)
+                for transformed_channel, tensor, default_value in channels:
+                    job = (
+                        transformed_channel,
+                        tensor,
+                        image.affine,
+                        transform,
+                        interpolation,
+                        default_value,
+                    )
+                    sitk_jobs.append(job)
+                transformed_images.append((image, transformed))
+        for (space, interpolation), batch in batches.items():
+            images, default_values_list = zip(*batch)
+            transformed_tensors = self.apply_grid_sample(
+                [image.data for image in images],
+                grids[space],
+                interpolation,
+                sum(default_values_list, []),
+            )
+            transformed_images.extend(zip(images, transformed_tensors))
+        # The SimpleITK outputs are filled before setting the data, as the
+        # tensors are checked when they are set
+        self.run_sitk_jobs(sitk_jobs)
+        for image, transformed in transformed_images:
+            if self.device is not None:
+                transformed = transformed.to(self.device)
+            image.set_data(transformed)
         return subject
 
+    def use_grid_sample(self, interpolation: str) -> bool:
+        if interpolation not in GRID_SAMPLE_MODES or self.device is None:
+            return False
+        return torch.device(self.device).type != 'cpu'
+
+    def run_sitk_jobs(self, jobs: List[tuple]) -> None:
+        """Resample channels with SimpleITK, in parallel if there are several.
+
+        SimpleITK releases the GIL while resampling, so channels of all images
+        in the subject can be resampled concurrently. The threads available to
+        ITK are split among the workers to avoid oversubscribing the CPU.
+        """
+        if not jobs:
+            return
+        num_workers = min(len(jobs), os.cpu_count() or 1)
+        if num_workers == 1:
+            for job in jobs:
+                self._resample_channel(*job)
+            return
+        total_threads = sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+        num_threads = max(1, total_threads // num_workers)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(self._resample_channel, *job, num_threads)
+                for job in jobs
+            ]
+            for future in futures:
+                future.result()
+
+    def _resample_channel(
+        self,
+        output: torch.Tensor,
+        tensor: torch.Tensor,
+        affine: np.ndarray,
+        transform: sitk.Transform,
+        interpolation: str,
+        default_value: float,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        # The tensor might be on an accelerator if it was transformed before
+        tensor = tensor.cpu()
+        sitk_image = nib_to_sitk(tensor[np.newaxis], affine, force_3d=True)
+        self.apply_affine_transform(
+            sitk_image,
+            transform,
+            interpolation,
+            default_value,
+            num_threads=num_threads,
+            out=output,
+        )
+
+    def is_identity(self) -> bool:
+        scales_close = np.abs(np.array(self.scales) - 1).max() < SCALES_TOLERANCE
+        degrees_close = np.abs(self.degrees).max() < DEGREES_TOLERANCE
+        translation_close = np.abs(self.translation).max() < TRANSLATION_TOLERANCE
+        return bool(scales_close and degrees_close and translation_close)
+
+    def get_default_value(self, tensor: torch.Tensor, image: Image) -> float:
+        if image[TYPE] != INTENSITY:
+            return 0
+        if self.default_pad_value == 'minimum':
+            return tensor.min().item()
+        elif self.default_pad_value == 'mean':
+            return get_borders_mean(tensor.cpu().numpy(), filter_otsu=False)
+        elif self.default_pad_value == 'otsu':
+            return get_borders_mean(tensor.cpu().numpy(), filter_otsu=True)
+        else:
+            assert isinstance(self.default_pad_value, Number)
+            return float(self.default_pad_value)
+
+    @staticmethod
+    def get_voxel_transform(
+        image: Image,
+        transform: sitk.Transform,
+    ) -> np.ndarray:
+        """Get the matrix mapping output voxel indices to input indices."""
+        # The transform is affine, so mapping four voxels is enough. Voxels
+        # are used instead of world coordinates to avoid rounding errors when
+        # the image origin is far from the world origin
+        indices = np.vstack((np.zeros(3), np.eye(3)))
+        voxel_to_lps = FLIPXY_44 @ image.affine
+        points = nib.affines.apply_affine(voxel_to_lps, indices)
+        transformed_points = [transform.TransformPoint(p) for p in points]
+        lps_to_voxel = np.linalg.inv(voxel_to_lps)
+        origin, *axes = nib.affines.apply_affine(lps_to_voxel, transformed_points)
+        matrix = np.eye(4)
+        matrix[:3, :3] = np.transpose(np.array(axes) - origin)
+        matrix[:3, 3] = origin
+        return matrix
+
+    def get_sampling_grid(
+        self,
+        image: Image,
+        transform: sitk.Transform,
+        device: Optional[Union[str, torch.device]] = None,
+    ) -> torch.Tensor:
+        voxel_transform = self.get_voxel_transform(image, transform)
+
+        # Output voxel indices to input coordinates in [-1, 1], with
+        # align_corners=False
+        size = np.array(image.spatial_shape, dtype=float)
+        matrix = 2 * voxel_transform[:3, :3] / size[:, np.newaxis]
+        offset = (2 * voxel_transform[:3, 3] + 1) / size - 1
+
+        # Each coordinate is the sum of a plane along the first two axes and a
+        # line along the last one, computed in double precision. This is much
+        # lighter and more accurate than a double precision affine_grid
+        grid = torch.empty(
+            (1, *image.spatial_shape, 3),
+            dtype=torch.float32,
+            device=device,
+        )
+        i, j, k = (np.arange(n, dtype=float) for n in image.spatial_shape)
+        for axis in range(3):
+            plane = np.add.outer(matrix[axis, 0] * i, matrix[axis, 1] * j)
+            plane += offset[axis]
+            line = matrix[axis, 2] * k
+            torch.add(
+                torch.as_tensor(plane[..., np.newaxis], device=device).float(),
+                torch.as_tensor(line, device=device).float(),
+                # PyTorch expects the coordinates in reversed order, (k, j, i)
+                out=grid[0, ..., 2 - axis],
+            )
+        return grid
+
+    def apply_grid_sample(
+        self,
+        tensors: Sequence[torch.Tensor],
+        grid: torch.Tensor,
+        interpolation: str,
+        default_values: Sequence[float],
+    ) -> List[torch.Tensor]:
+        """Resample the channels of all tensors with a single call."""
+        num_channels = [len(tensor) for tensor in tensors]
+        spatial_shape = tensors[0].shape[1:]
+        shape = 1, sum(num_channels), *spatial_shape
+        data = torch.empty(shape, dtype=grid.dtype, device=grid.device)
+        first = 0
+        for tensor in tensors:
+            # Asynchronous if the tensor is in pinned memory
+            data[0, first : first + len(tensor)].copy_(tensor, non_blocking=True)
+            first += len(tensor)
+        resampled = F.grid_sample(
+            data,
+            grid,
+            mode=GRID_SAMPLE_MODES[interpolation],
+            padding_mode='border',
+            align_corners=False,
+        )[0]
+        del data
+        # Like in ITK, points outside the image bounds get the default value
+        outside = torch.zeros(spatial_shape, dtype=torch.bool, device=grid.device)
+        for coordinates in grid[0].unbind(dim=-1):
+            outside |= coordinates < -1
+            outside |= coordinates > 1
+        defaults = torch.as_tensor(
+            default_values,
+            dtype=resampled.dtype,
+            device=resampled.device,
+        )
+        resampled[:, outside] = defaults[:, np.newaxis]
+        if len(tensors) == 1:
+            return [resampled]
+        # Copy each chunk so that images do not share the same storage
+        return [chunk.clone() for chunk in resampled.split(num_channels)]
+
     def apply_affine_transform(
         self,
         sitk_image: sitk.Image,
         transform: sitk.Transform,
         interpolation: str,
         default_value: float,
+        num_threads: Optional[int] = None,
+        out: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
         floating = reference = sitk_image
 
@@ -403,16 +619,42 @@ class Affine(SpatialTransform):
         resampler.SetDefaultPixelValue(float(default_value))
         resampler.SetOutputPixelType(sitk.sitkFloat32)
         resampler.SetTransform(transform)
+        if num_threads is not None:
+            resampler.SetNumberOfThreads(num_threads)
         resampled = resampler.Execute(floating)
 
+        if out is not None:
+            # Copy the voxels straight from the ITK buffer, without allocating
+            # an intermediate array
+            view = sitk.GetArrayViewFromImage(resampled).transpose()
+            np.copyto(out.numpy(), view)
+            return out
+
         np_array = sitk.GetArrayFromImage(resampled)
         np_array = np_array.transpose()  # ITK to NumPy
         tensor = torch.as_tensor(np_array)
         return tensor
 
 
-def get_borders_mean(image, filter_otsu=True):
-    array = sitk.GetArrayViewFromImage(image)
+def get_rotation_matrix(
+    radians_x: float,
+    radians_y: float,
+    radians_z: float,
+) -> np.ndarray:
+    """Get the rotation matrix of an ITK Euler 3D transform.
+
+    Rotations are applied around :math:`x`, then :math:`y` and then :math:`z`,
+    i.e., :math:`R = R_z R_x R_y`.
+    """
+    cos_x, cos_y, cos_z = np.cos((radians_x, radians_y, radians_z))
+    sin_x, sin_y, sin_z = np.sin((radians_x, radians_y, radians_z))
+    rotation_x = np.array(((1, 0, 0), (0, cos_x, -sin_x), (0, sin_x, cos_x)))
+    rotation_y = np.array(((cos_y, 0, sin_y), (0, 1, 0), (-sin_y, 0, cos_y)))
+    rotation_z = np.array(((cos_z, -sin_z, 0), (sin_z, cos_z, 0), (0, 0, 1)))
+    return rotation_z @ rotation_x @ rotation_y
+
+
+def get_borders_mean(array: np.ndarray, filter_otsu: bool = True) -> float:
     borders_tuple = (
         array[0, :, :],
         array[-1, :, :],
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 """Tests for Image."""
 import copy
+import os
 import sys
 import tempfile
+import warnings
+from pathlib import Path
+from unittest import mock
 
 import nibabel as nib
 import numpy as np
@@ -20,6 +24,25 @@ class TestImage(TorchioTestCase):
         with pytest.raises(FileNotFoundError):
             tio.ScalarImage('nopath')
 
+    def test_path_check_cached(self):
+        path = self.get_image_path('cached')
+        tio.ScalarImage(path)
+        with mock.patch('pathlib.Path.is_file') as is_file:
+            tio.ScalarImage(path)
+        is_file.assert_not_called()
+
+    def test_path_check_cached_relative(self):
+        path = Path(self.get_image_path('cached_relative'))
+        current_dir = os.getcwd()
+        try:
+            os.chdir(path.parent)
+            tio.ScalarImage(path.name)
+            os.chdir(self.dir.parent)
+            with pytest.raises(FileNotFoundError):
+                tio.ScalarImage(path.name)
+        finally:
+            os.chdir(current_dir)
+
     @pytest.mark.skipif(sys.platform == 'win32', reason='Path not valid')
     def test_wrong_path_value(self):
         with pytest.raises(RuntimeError):
@@ -281,3 +304,34 @@ class TestImage(TorchioTestCase):
         new_image = copy.copy(my_image)
         assert my_image._loaded
         assert new_image._loaded
+
+    def test_pin_memory(self):
+        path = self.get_image_path('im_pin')
+        image = tio.ScalarImage(path, pin_memory=True)
+        image.load()
+        assert image.data.is_pinned() == torch.cuda.is_available()
+        assert copy.copy(image).pin_memory
+
+    def test_load_contiguous(self):
+        def transposed_reader(path):
+            return np.random.rand(4, 3, 2, 1).transpose(), np.eye(4)
+
+        path = self.get_image_path('im_contiguous')
+        image = tio.ScalarImage(path, reader=transposed_reader)
+        assert image.data.is_contiguous()
+
+    def test_nans_infinities(self):
+        tensors = (
+            torch.tensor([1, np.inf, -np.inf]),
+            torch.tensor([1, np.inf, -np.inf], dtype=torch.float16),
+        )
+        for tensor in tensors:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', RuntimeWarning)
+                tio.ScalarImage(tensor=tensor.reshape(1, -1, 1, 1), check_nans=True)
+
+    def test_nans_integer_tensor(self):
+        tensor = torch.randint(0, 10, (1, 2, 3, 4))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            tio.LabelMap(tensor=tensor, check_nans=True)
@@ -1,6 +1,7 @@
 import tempfile
 from pathlib import Path
 
+import nibabel as nib
 import numpy as np
 import pytest
 import SimpleITK as sitk
@@ -32,6 +33,43 @@ class TestIO(TorchioTestCase):
         # I need to find something readable by nib but not sitk
         io.read_image(self.nii_path)
 
+    def check_read_nifti_same_as_sitk(self, path):
+        nib_tensor, nib_affine = io.read_image(path)
+        sitk_tensor, sitk_affine = io._read_sitk(path)
+        assert nib_tensor.dtype == sitk_tensor.dtype
+        self.assert_tensor_almost_equal(nib_tensor, sitk_tensor)
+        self.assert_tensor_almost_equal(nib_affine, sitk_affine)
+        self.assert_tensor_almost_equal(io.read_affine(path), sitk_affine)
+        assert io.read_shape(path) == tuple(sitk_tensor.shape)
+
+    def test_read_nifti_same_as_sitk(self):
+        self.check_read_nifti_same_as_sitk(self.nii_path)
+
+    def test_read_nifti_same_as_sitk_special_cases(self):
+        affine = np.diag((2, 3, 4, 1.0))
+        affine[:3, 3] = 10, 20, 30
+        shifted = affine.copy()
+        shifted[:3, 3] += 5
+        scaled = nib.Nifti1Image(
+            np.arange(120, dtype=np.int16).reshape(4, 5, 6),
+            affine,
+        )
+        scaled.header.set_slope_inter(0.5, 1)
+        image_2d = nib.Nifti1Image(np.random.rand(4, 5).astype(np.float32), affine)
+        image_4d = nib.Nifti1Image(np.random.rand(4, 5, 6, 3), affine)
+        rgb_dtype = np.dtype([('R', 'u1'), ('G', 'u1'), ('B', 'u1')])
+        rgb = nib.Nifti1Image(np.zeros((4, 5, 6), dtype=rgb_dtype), affine)
+        images = [scaled, image_2d, image_4d, rgb]
+        for sform_code in 1, 2:
+            different_forms = nib.Nifti1Image(np.random.rand(4, 5, 6), None)
+            different_forms.set_qform(affine, code=1)
+            different_forms.set_sform(shifted, code=sform_code)
+            images.append(different_forms)
+        for i, image in enumerate(images):
+            path = self.dir / f'image_{i}.nii.gz'
+            nib.save(image, path)
+            self.check_read_nifti_same_as_sitk(path)
+
     def test_save_rgb(self):
         im = ScalarImage(tensor=torch.rand(1, 4, 5, 1))
         with pytest.warns(RuntimeWarning):
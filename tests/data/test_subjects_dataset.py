@@ -1,3 +1,8 @@
+import gc
+import os
+import pickle
+import sys
+
 import pytest
 import torch
 import torchio as tio
@@ -64,3 +69,44 @@ class TestSubjectsDataset(TorchioTestCase):
             dataset[0].t1.data,
             new_dataset[0].t1.data,
         )
+
+    def test_cache(self):
+        subject = self.subjects_list[-1]
+        dataset = tio.SubjectsDataset([subject], cache_size=3)
+        other_dataset = tio.SubjectsDataset([subject], cache_size=4)
+        first = dataset[0]
+        other_dataset[0]
+        first.t1.data.fill_(0)
+        second = dataset[0]
+        other_dataset[0]
+        # The subject has three images
+        assert dataset._volume_cache.cache_info().hits == 3
+        assert other_dataset._volume_cache.cache_info().hits == 3
+        self.assert_tensor_not_equal(first.t1.data, second.t1.data)
+        self.assert_tensor_equal(second.t1.data, dataset[0].t1.data)
+        # Images loaded outside of the dataset do not use its cache
+        cache_info = dataset._volume_cache.cache_info()
+        subject.load()
+        assert dataset._volume_cache.cache_info() == cache_info
+
+    @pytest.mark.skipif(sys.platform != 'linux', reason='Uses /proc')
+    def test_cache_no_memory_maps(self):
+        def get_num_open_files():
+            return len(os.listdir('/proc/self/fd'))
+
+        paths = [self.get_image_path(f't1_{i}', suffix='.nii') for i in range(10)]
+        subjects = [tio.Subject(t1=tio.ScalarImage(path)) for path in paths]
+        dataset = tio.SubjectsDataset(subjects, cache_size=10)
+        num_open_files = get_num_open_files()
+        for i in range(len(dataset)):
+            dataset[i]
+        gc.collect()
+        assert get_num_open_files() == num_open_files
+
+    def test_cache_pickle(self):
+        dataset = tio.SubjectsDataset([self.subjects_list[-1]], cache_size=3)
+        dataset[0]
+        copied = pickle.loads(pickle.dumps(dataset))
+        assert copied._volume_cache.cache_info().currsize == 0
+        copied[0]
+        assert copied._volume_cache.cache_info().misses == 3
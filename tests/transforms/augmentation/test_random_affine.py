@@ -1,6 +1,13 @@
+from unittest import mock
+
+import numpy as np
 import pytest
+import SimpleITK as sitk
 import torch
 import torchio as tio
+from torchio.transforms.augmentation.spatial.random_affine import (
+    get_rotation_matrix,
+)
 
 from ...utils import TorchioTestCase
 
@@ -181,3 +188,151 @@ class TestRandomAffine(TorchioTestCase):
         with pytest.raises(RuntimeError):
             tio.RandomAffine()(new_subject)
         tio.RandomAffine(check_shape=False)(new_subject)
+
+    def test_grid_sample_same_as_sitk(self):
+        # grid_sample is only used on accelerators, but it can run on the CPU
+        image = self.sample_subject.t1
+        affine = tio.Affine(
+            scales=(1.1, 0.9, 1.2),
+            degrees=(10, -20, 30),
+            translation=(2, 3, -1),
+        )
+        transform = affine.get_affine_transform(image)
+        sitk_image = image.as_sitk(force_3d=True)
+        expected = affine.apply_affine_transform(sitk_image, transform, 'linear', 5)
+        grid = affine.get_sampling_grid(image, transform)
+        (transformed,) = affine.apply_grid_sample([image.data], grid, 'linear', [5])
+        # ITK interpolates in double precision and grid_sample in single
+        self.assert_tensor_almost_equal(
+            transformed[0],
+            expected,
+            rtol=1e-4,
+            atol=1e-4,
+        )
+
+    def test_batched_same_as_single(self):
+        t1, t2 = self.sample_subject.t1, self.sample_subject.t2
+        affine = tio.Affine(scales=1.1, degrees=10, translation=2)
+        grid = affine.get_sampling_grid(t1, affine.get_affine_transform(t1))
+        batched = affine.apply_grid_sample([t1.data, t2.data], grid, 'linear', [1, 2])
+        (single,) = affine.apply_grid_sample([t2.data], grid, 'linear', [2])
+        self.assert_tensor_equal(batched[1], single)
+        assert batched[0].untyped_storage().data_ptr() != (
+            batched[1].untyped_storage().data_ptr()
+        )
+
+    def test_resample_into_output(self):
+        image = self.sample_subject.t1
+        affine = tio.Affine(scales=1.1, degrees=10, translation=2)
+        transform = affine.get_affine_transform(image)
+        sitk_image = image.as_sitk(force_3d=True)
+        expected = affine.apply_affine_transform(sitk_image, transform, 'bspline', 0)
+        out = torch.empty_like(expected)
+        result = affine.apply_affine_transform(
+            sitk_image,
+            transform,
+            'bspline',
+            0,
+            out=out,
+        )
+        assert result is out
+        self.assert_tensor_equal(out, expected)
+
+    def test_device(self):
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        transform = tio.RandomAffine(
+            default_pad_value=0,
+            image_interpolation='bspline',
+            device=device,
+        )
+        transformed = transform(self.sample_subject)
+        for image in transformed.get_images(intensity_only=False):
+            assert image.data.device.type == device
+            assert image.data.dtype == torch.float32
+        reproduced = transformed.get_composed_history()(self.sample_subject)
+        self.assert_tensor_almost_equal(
+            transformed.t1.data.cpu(),
+            reproduced.t1.data.cpu(),
+        )
+
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason='No GPU')
+    def test_chained_on_gpu(self):
+        for interpolation in 'linear', 'bspline':
+            transform = tio.RandomAffine(
+                default_pad_value='otsu',
+                image_interpolation=interpolation,
+                device='cuda',
+            )
+            transformed = tio.Compose([transform, transform])(self.sample_subject)
+            for image in transformed.get_images(intensity_only=False):
+                assert image.data.is_cuda
+
+    def test_parallel_same_as_sequential(self):
+        affine = tio.Affine(
+            scales=1.1,
+            degrees=10,
+            translation=2,
+            image_interpolation='bspline',
+        )
+        sequential = affine(self.sample_subject)
+        cpu_count = 'torchio.transforms.augmentation.spatial.random_affine.os.cpu_count'
+        with mock.patch(cpu_count, return_value=4):
+            parallel = affine(self.sample_subject)
+        self.assert_tensor_equal(sequential.t1.data, parallel.t1.data)
+        self.assert_tensor_equal(sequential.t2.data, parallel.t2.data)
+
+    def test_identity_not_applied(self):
+        affine = tio.Affine(scales=1.0001, degrees=0.001, translation=0)
+        transformed = affine(self.sample_subject)
+        self.assert_tensor_equal(transformed.t1.data, self.sample_subject.t1.data)
+        for image in transformed.get_images(intensity_only=False):
+            assert image.data.dtype == torch.float32
+
+    def test_params_in_ranges(self):
+        transform = tio.RandomAffine(
+            scales=(0.5, 0.6, 1, 1, 2, 3),
+            degrees=(-1, 0, 10, 20, 30, 40),
+            translation=(5, 6, 7, 8, 9, 10),
+        )
+        scaling, rotation, translation = transform.get_params(
+            transform.scales,
+            transform.degrees,
+            transform.translation,
+            False,
+        )
+        for params, ranges in (
+            (scaling, transform.scales),
+            (rotation, transform.degrees),
+            (translation, transform.translation),
+        ):
+            assert all(ranges[::2] <= params.numpy())
+            assert all(params.numpy() <= ranges[1::2])
+
+    def test_labels_half_voxel_same_as_sitk(self):
+        tensor = torch.arange(11, dtype=torch.float32).reshape(1, 11, 1, 1)
+        label_map = tio.LabelMap(tensor=tensor)
+        translated = tio.Affine(scales=1, degrees=0, translation=(0.5, 0, 0))
+        self.assert_tensor_equal(translated(label_map).data, tensor)
+        for kwargs in (
+            {'scales': 1, 'degrees': 0, 'translation': (0.5, 0, 0)},
+            {'scales': (2, 1, 1), 'degrees': 0, 'translation': 0},
+        ):
+            affine = tio.Affine(**kwargs)
+            transform = affine.get_affine_transform(label_map)
+            expected = affine.apply_affine_transform(
+                label_map.as_sitk(force_3d=True),
+                transform,
+                'nearest',
+                0,
+            )
+            transformed = affine(label_map)
+            self.assert_tensor_equal(transformed.data[0], expected)
+
+    def test_rotation_matrix_same_as_euler(self):
+        radians = 0.1, -0.2, 0.3
+        euler = sitk.Euler3DTransform()
+        euler.SetRotation(*radians)
+        self.assert_tensor_almost_equal(
+            get_rotation_matrix(*radians),
+            np.array(euler.GetMatrix()).reshape(3, 3),
+        )